@@ -3,13 +3,71 @@ ETL Pipeline for Retail Network Analytics
 Processes raw CSV data and generates consolidated metrics and insights.
 """
 
-import pandas as pd
+try:
+    # FireDucks is a drop-in, lazily fused pandas implementation (Linux only);
+    # fall back to plain pandas wherever it is not installed
+    import fireducks.pandas as pd
+except ImportError:
+    import pandas as pd
 import numpy as np
-import json
+import orjson
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 
+# Columns read from each raw CSV; anything not listed is never used downstream
+# and is skipped at parse time instead of being dropped later
+CSV_COLUMNS = {
+    'customers': ['id', 'name', 'age', 'region'],
+    'products': ['id', 'name', 'category', 'price', 'supplier'],
+    'sales': ['id', 'customer_id', 'product_id', 'date', 'quantity', 'unit_price', 'total_amount'],
+    'inventory': ['id', 'product_id', 'current_stock', 'reorder_level', 'max_stock', 'turnover_rate', 'last_updated'],
+}
+
+# Known schema of sales.csv, the largest input. Ids and quantity may be missing
+# in raw data (handled during cleaning), so they use nullable integer types;
+# monetary columns stay float64 so revenue totals remain exact to the cent.
+SALES_DTYPES = {
+    'id': 'Int32',
+    'customer_id': 'Int32',
+    'product_id': 'Int32',
+    'quantity': 'Int16',
+    'unit_price': 'float64',
+    'total_amount': 'float64',
+}
+
+# Extra read_csv arguments per file
+CSV_READ_OPTIONS = {
+    'sales': {'dtype': SALES_DTYPES, 'parse_dates': ['date'], 'engine': 'pyarrow'},
+}
+
+AGE_GROUP_LABELS = ['18-25', '26-35', '36-50', '51-65', '65+']
+AGE_GROUP_UPPER_BOUNDS = np.array([25, 35, 50, 65])
+
+def bin_ages(ages: np.ndarray) -> np.ndarray:
+    """Map ages to AGE_GROUP_LABELS codes (upper bounds inclusive, as with pd.cut)"""
+    return np.searchsorted(AGE_GROUP_UPPER_BOUNDS, ages, side='left').astype(np.int8)
+
+def days_since(timestamps: np.ndarray, now: np.datetime64) -> np.ndarray:
+    """Whole days elapsed between each datetime64 value and `now`"""
+    return (now - timestamps).astype('timedelta64[D]').astype(np.int64)
+
+def round_floats(value: Any, ndigits: int = 2) -> Any:
+    """Round every float in a nested structure of dicts and lists"""
+    if isinstance(value, float):
+        return round(value, ndigits)
+    if isinstance(value, dict):
+        return {key: round_floats(item, ndigits) for key, item in value.items()}
+    if isinstance(value, list):
+        return [round_floats(item, ndigits) for item in value]
+    return value
+
+def write_json(path: str, data: Any):
+    """Serialize data to an indented JSON file; NumPy scalars and arrays are handled natively"""
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+
 class RetailETLPipeline:
     def __init__(self, data_dir: str = '../data'):
         self.data_dir = data_dir
@@ -18,25 +76,74 @@ class RetailETLPipeline:
         self.sales_df: Optional[pd.DataFrame] = None
         self.inventory_df: Optional[pd.DataFrame] = None
         self.processed_data: Dict[str, Any] = {}
+        self.cache_dir = os.path.join(data_dir, '_cache')
+        self.loaded_from_cache = False
         
     def load_data(self):
-        """Load CSV data into pandas DataFrames"""
-        print("Loading raw data...")
-        
-        try:
-            self.customers_df = pd.read_csv(f'{self.data_dir}/customers.csv')
-            self.products_df = pd.read_csv(f'{self.data_dir}/products.csv')
-            self.sales_df = pd.read_csv(f'{self.data_dir}/sales.csv')
-            self.inventory_df = pd.read_csv(f'{self.data_dir}/inventory.csv')
+        """Load cleaned data from the Parquet cache when it is up to date, otherwise the raw CSVs"""
+        if self._cache_is_fresh():
+            print("Loading cleaned data from cache...")
+            self.customers_df = pd.read_parquet(self._cache_path('customers'))
+            self.products_df = pd.read_parquet(self._cache_path('products'))
+            self.sales_df = pd.read_parquet(self._cache_path('sales'))
+            self.inventory_df = pd.read_parquet(self._cache_path('inventory'))
+            self.loaded_from_cache = True
+        else:
+            print("Loading raw data...")
+            try:
+                # The CSV parsers release the GIL, so the four files are read concurrently
+                with ThreadPoolExecutor(max_workers=len(CSV_COLUMNS)) as executor:
+                    futures = {
+                        name: executor.submit(
+                            pd.read_csv,
+                            f'{self.data_dir}/{name}.csv',
+                            usecols=columns,
+                            **CSV_READ_OPTIONS.get(name, {})
+                        )
+                        for name, columns in CSV_COLUMNS.items()
+                    }
+                    self.customers_df = futures['customers'].result()
+                    self.products_df = futures['products'].result()
+                    self.sales_df = futures['sales'].result()
+                    self.inventory_df = futures['inventory'].result()
+            except FileNotFoundError as e:
+                print(f"Error loading data: {e}")
+                raise
             
-            print(f"Loaded {len(self.customers_df)} customers")
-            print(f"Loaded {len(self.products_df)} products")
-            print(f"Loaded {len(self.sales_df)} sales records")
-            print(f"Loaded {len(self.inventory_df)} inventory records")
-            
-        except FileNotFoundError as e:
-            print(f"Error loading data: {e}")
-            raise
+            self._downcast_integers()
+            self.loaded_from_cache = False
+        
+        print(f"Loaded {len(self.customers_df)} customers")
+        print(f"Loaded {len(self.products_df)} products")
+        print(f"Loaded {len(self.sales_df)} sales records")
+        print(f"Loaded {len(self.inventory_df)} inventory records")
+    
+    def _cache_path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, f'{name}.parquet')
+    
+    def _cache_is_fresh(self) -> bool:
+        """Whether every cached frame is newer than the raw CSVs and this pipeline's cleaning code"""
+        cache_files = [self._cache_path(name) for name in CSV_COLUMNS]
+        if not all(os.path.exists(path) for path in cache_files):
+            return False
+        
+        sources = [f'{self.data_dir}/{name}.csv' for name in CSV_COLUMNS] + [__file__]
+        newest_source = max(os.path.getmtime(path) for path in sources if os.path.exists(path))
+        return min(os.path.getmtime(path) for path in cache_files) > newest_source
+    
+    def _write_cache(self):
+        """Persist the cleaned frames as zstd-compressed Parquet for later runs"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.customers_df.to_parquet(self._cache_path('customers'), compression='zstd', index=False)
+        self.products_df.to_parquet(self._cache_path('products'), compression='zstd', index=False)
+        self.sales_df.to_parquet(self._cache_path('sales'), compression='zstd', index=False)
+        self.inventory_df.to_parquet(self._cache_path('inventory'), compression='zstd', index=False)
+    
+    def _downcast_integers(self):
+        """Shrink 64-bit integer columns to the smallest type that holds their values"""
+        for df in (self.customers_df, self.products_df, self.sales_df, self.inventory_df):
+            for col in df.select_dtypes('int64').columns:
+                df[col] = pd.to_numeric(df[col], downcast='integer')
     
     def clean_data(self):
         """Handle inconsistencies, missing values, duplicates, and outliers"""
@@ -53,15 +160,15 @@ class RetailETLPipeline:
         self.customers_df = self.customers_df.drop_duplicates(subset=['id'])
         print(f"    Removed {initial_customers - len(self.customers_df)} duplicate customers")
         
-        # Handle missing values
+        # Handle missing values (low-cardinality group keys are stored as categoricals)
         self.customers_df['name'] = self.customers_df['name'].fillna('Unknown Customer')
         self.customers_df['age'] = self.customers_df['age'].fillna(self.customers_df['age'].median())
-        self.customers_df['region'] = self.customers_df['region'].fillna('Unknown')
+        self.customers_df['region'] = self.customers_df['region'].fillna('Unknown').astype('category')
         
         # Remove age outliers (below 18 or above 100)
-        age_outliers = len(self.customers_df[(self.customers_df['age'] < 18) | (self.customers_df['age'] > 100)])
-        self.customers_df = self.customers_df[(self.customers_df['age'] >= 18) & (self.customers_df['age'] <= 100)]
-        print(f"    Removed {age_outliers} age outliers")
+        before_age_filter = len(self.customers_df)
+        self.customers_df = self.customers_df.query('18 <= age <= 100')
+        print(f"    Removed {before_age_filter - len(self.customers_df)} age outliers")
         
         # Clean products data
         print("  Cleaning products...")
@@ -69,15 +176,15 @@ class RetailETLPipeline:
         self.products_df = self.products_df.drop_duplicates(subset=['id'])
         print(f"    Removed {initial_products - len(self.products_df)} duplicate products")
         
-        # Handle missing values
+        # Handle missing values (low-cardinality group keys are stored as categoricals)
         self.products_df['name'] = self.products_df['name'].fillna('Unknown Product')
-        self.products_df['category'] = self.products_df['category'].fillna('Other')
-        self.products_df['supplier'] = self.products_df['supplier'].fillna('Unknown Supplier')
+        self.products_df['category'] = self.products_df['category'].fillna('Other').astype('category')
+        self.products_df['supplier'] = self.products_df['supplier'].fillna('Unknown Supplier').astype('category')
         
         # Remove price outliers (negative prices or extremely high prices)
-        price_outliers = len(self.products_df[(self.products_df['price'] <= 0) | (self.products_df['price'] > 10000)])
-        self.products_df = self.products_df[(self.products_df['price'] > 0) & (self.products_df['price'] <= 10000)]
-        print(f"    Removed {price_outliers} price outliers")
+        before_price_filter = len(self.products_df)
+        self.products_df = self.products_df.query('0 < price <= 10000')
+        print(f"    Removed {before_price_filter - len(self.products_df)} price outliers")
         
         # Clean sales data
         print("  Cleaning sales...")
@@ -86,46 +193,42 @@ class RetailETLPipeline:
         print(f"    Removed {initial_sales - len(self.sales_df)} duplicate sales")
         
         # Remove sales with invalid customer_id or product_id
-        valid_customers = set(self.customers_df['id'])
-        valid_products = set(self.products_df['id'])
+        valid_customers = self.customers_df['id'].values
+        valid_products = self.products_df['id'].values
         
         before_validation = len(self.sales_df)
         self.sales_df = self.sales_df[
             (self.sales_df['customer_id'].isin(valid_customers)) &
             (self.sales_df['product_id'].isin(valid_products))
-        ]
+        ].astype({'customer_id': 'int32', 'product_id': 'int32'})
         print(f"    Removed {before_validation - len(self.sales_df)} sales with invalid references")
         
         # Handle missing values and outliers
-        self.sales_df['quantity'] = self.sales_df['quantity'].fillna(1)
-        self.sales_df = self.sales_df[self.sales_df['quantity'] > 0]
-        self.sales_df = self.sales_df[self.sales_df['total_amount'] > 0]
-        
-        # Convert date column
-        self.sales_df['date'] = pd.to_datetime(self.sales_df['date'])
+        self.sales_df['quantity'] = self.sales_df['quantity'].fillna(1).astype('int16')
+        self.sales_df = self.sales_df.query('quantity > 0 and total_amount > 0')
         
         # Clean inventory data
         print("  Cleaning inventory...")
         # Ensure all products have inventory records
-        missing_inventory = set(self.products_df['id']) - set(self.inventory_df['product_id'])
-        if missing_inventory:
+        missing_inventory = np.setdiff1d(self.products_df['id'].values, self.inventory_df['product_id'].values)
+        if len(missing_inventory) > 0:
             print(f"    Adding {len(missing_inventory)} missing inventory records")
-            for product_id in missing_inventory:
-                new_record = {
-                    'id': product_id,
-                    'product_id': product_id,
-                    'current_stock': 0,
-                    'reorder_level': 10,
-                    'max_stock': 100,
-                    'turnover_rate': 1.0,
-                    'last_updated': datetime.now().strftime('%Y-%m-%d')
-                }
-                self.inventory_df = pd.concat([self.inventory_df, pd.DataFrame([new_record])], ignore_index=True)
+            new_records = pd.DataFrame({
+                'id': missing_inventory,
+                'product_id': missing_inventory,
+                'current_stock': 0,
+                'reorder_level': 10,
+                'max_stock': 100,
+                'turnover_rate': 1.0,
+                'last_updated': datetime.now().strftime('%Y-%m-%d')
+            })
+            self.inventory_df = pd.concat([self.inventory_df, new_records], ignore_index=True)
         
         # Ensure non-negative stock levels
         self.inventory_df['current_stock'] = self.inventory_df['current_stock'].clip(lower=0)
         self.inventory_df['turnover_rate'] = self.inventory_df['turnover_rate'].fillna(1.0)
         
+        self._write_cache()
         print("Data cleaning completed.")
     
     def generate_metrics(self):
@@ -136,61 +239,70 @@ class RetailETLPipeline:
         if self.customers_df is None or self.products_df is None or self.sales_df is None or self.inventory_df is None:
             raise ValueError("Data must be loaded and cleaned before generating metrics.")
         
+        # Join sales with the customer and product attributes used below, once
+        sales_enriched = self.sales_df.merge(
+            self.customers_df[['id', 'region']].rename(columns={'id': 'customer_id'}),
+            on='customer_id'
+        ).merge(
+            self.products_df[['id', 'name', 'category']].rename(columns={'id': 'product_id'}),
+            on='product_id'
+        )
+        
         # Revenue by region
-        sales_with_customer = self.sales_df.merge(self.customers_df, left_on='customer_id', right_on='id', suffixes=('', '_customer'))
-        revenue_by_region = sales_with_customer.groupby('region')['total_amount'].agg(['sum', 'count', 'mean']).round(2)
+        revenue_by_region = sales_enriched.groupby('region', observed=True)['total_amount'].agg(['sum', 'count', 'mean'])
         revenue_by_region.columns = ['total_revenue', 'total_sales', 'avg_order_value']
         
         # Top-selling products
-        sales_with_product = self.sales_df.merge(self.products_df, left_on='product_id', right_on='id', suffixes=('', '_product'))
-        top_products = sales_with_product.groupby(['product_id', 'name', 'category']).agg({
+        top_products = sales_enriched.groupby(['product_id', 'name', 'category'], observed=True).agg({
             'quantity': 'sum',
             'total_amount': 'sum',
             'id': 'count'
-        }).round(2)
+        })
         top_products.columns = ['total_quantity_sold', 'total_revenue', 'number_of_sales']
         top_products = top_products.sort_values('total_revenue', ascending=False).head(20)
         
         # Category performance
-        category_performance = sales_with_product.groupby('category').agg({
+        category_performance = sales_enriched.groupby('category', observed=True).agg({
             'total_amount': ['sum', 'mean'],
             'quantity': 'sum',
             'id': 'count'
-        }).round(2)
+        })
         category_performance.columns = ['total_revenue', 'avg_order_value', 'total_quantity', 'number_of_sales']
         category_performance = category_performance.sort_values('total_revenue', ascending=False)
         
         # Customer analysis
-        customer_metrics = self.sales_df.groupby('customer_id').agg({
-            'total_amount': ['sum', 'mean', 'count'],
-            'date': ['min', 'max']
-        }).round(2)
-        customer_metrics.columns = ['total_spent', 'avg_order_value', 'number_of_orders', 'first_purchase', 'last_purchase']
+        customer_metrics = self.sales_df.groupby('customer_id').agg(
+            total_spent=('total_amount', 'sum'),
+            avg_order_value=('total_amount', 'mean'),
+            number_of_orders=('total_amount', 'count'),
+            first_purchase=('date', 'min'),
+            last_purchase=('date', 'max')
+        )
         
         # Add customer demographics
-        customer_metrics = customer_metrics.merge(
-            self.customers_df[['id', 'age', 'region']], 
-            left_index=True, 
-            right_on='id'
-        ).set_index('id')
+        customer_metrics = customer_metrics.join(
+            self.customers_df.set_index('id')[['age', 'region']],
+            how='inner'
+        )
         
         # Customer churn analysis (customers who haven't purchased in last 90 days)
         cutoff_date = datetime.now() - timedelta(days=90)
-        customer_metrics['days_since_last_purchase'] = (pd.Timestamp.now() - pd.to_datetime(customer_metrics['last_purchase'])).dt.days
+        customer_metrics['days_since_last_purchase'] = days_since(
+            customer_metrics['last_purchase'].values, pd.Timestamp.now().to_datetime64()
+        )
         customer_metrics['is_churned'] = customer_metrics['days_since_last_purchase'] > 90
         
         # Age group analysis
-        customer_metrics['age_group'] = pd.cut(
-            customer_metrics['age'], 
-            bins=[0, 25, 35, 50, 65, 100], 
-            labels=['18-25', '26-35', '36-50', '51-65', '65+']
+        customer_metrics['age_group'] = pd.Categorical.from_codes(
+            bin_ages(customer_metrics['age'].values),
+            categories=AGE_GROUP_LABELS
         )
         
         age_group_analysis = customer_metrics.groupby('age_group', observed=True).agg({
             'total_spent': ['mean', 'sum'],
             'number_of_orders': 'mean',
             'is_churned': 'mean'
-        }).round(2)
+        })
         age_group_analysis.columns = ['avg_spent', 'total_spent', 'avg_orders', 'churn_rate']
         
         # Inventory insights
@@ -202,17 +314,28 @@ class RetailETLPipeline:
         ][['product_id', 'name', 'category', 'current_stock', 'reorder_level', 'turnover_rate']]
         
         # High/low turnover products
-        turnover_analysis = inventory_with_product.groupby('category')['turnover_rate'].agg(['mean', 'min', 'max']).round(2)
+        turnover_analysis = inventory_with_product.groupby('category', observed=True)['turnover_rate'].agg(['mean', 'min', 'max'])
         turnover_analysis.columns = ['avg_turnover', 'min_turnover', 'max_turnover']
         
-        # Monthly sales trends
-        self.sales_df['year_month'] = self.sales_df['date'].dt.to_period('M')
-        monthly_trends = self.sales_df.groupby('year_month').agg({
+        # Monthly sales trends, grouped on months since 1970 and labelled YYYY-MM afterwards
+        # Sales without a date are left out, as a period groupby would drop NaT keys
+        dated_sales = self.sales_df[self.sales_df['date'].notna()]
+        month_keys = dated_sales['date'].values.astype('datetime64[M]').astype(np.int32)
+        monthly_trends = dated_sales.groupby(month_keys).agg({
             'total_amount': 'sum',
             'quantity': 'sum',
             'id': 'count'
-        }).round(2)
+        })
         monthly_trends.columns = ['revenue', 'quantity_sold', 'number_of_sales']
+        monthly_trends.index = pd.Index(
+            np.datetime_as_string(monthly_trends.index.values.astype('datetime64[M]'), unit='M'),
+            name='year_month'
+        )
+        
+        # Churn counts from a single pass over the flag, without building filtered copies
+        total_customers = len(customer_metrics)
+        churned_customers = int(customer_metrics['is_churned'].sum())
+        churn_rate = churned_customers / total_customers if total_customers else 0.0
         
         # Store processed data
         self.processed_data = {
@@ -220,10 +343,10 @@ class RetailETLPipeline:
             'top_products': top_products.reset_index().to_dict('records'),
             'category_performance': category_performance.to_dict('index'),
             'customer_metrics_summary': {
-                'total_customers': len(customer_metrics),
-                'active_customers': len(customer_metrics[~customer_metrics['is_churned']]),
-                'churned_customers': len(customer_metrics[customer_metrics['is_churned']]),
-                'churn_rate': customer_metrics['is_churned'].mean(),
+                'total_customers': total_customers,
+                'active_customers': total_customers - churned_customers,
+                'churned_customers': churned_customers,
+                'churn_rate': churn_rate,
                 'avg_customer_value': customer_metrics['total_spent'].mean(),
                 'avg_order_value': customer_metrics['avg_order_value'].mean()
             },
@@ -236,14 +359,14 @@ class RetailETLPipeline:
             'monthly_trends': monthly_trends.reset_index().to_dict('records'),
             'business_insights': self.generate_business_insights(
                 revenue_by_region, category_performance, age_group_analysis, 
-                customer_metrics, low_stock_products
+                churn_rate, low_stock_products
             )
         }
         
         print("Metrics generation completed.")
     
     def generate_business_insights(self, revenue_by_region, category_performance, 
-                                 age_group_analysis, customer_metrics, low_stock_products):
+                                 age_group_analysis, churn_rate, low_stock_products):
         """Generate specific business insights for decision-making"""
         insights = []
         
@@ -289,7 +412,8 @@ class RetailETLPipeline:
         
         # Inventory insights
         if len(low_stock_products) > 0:
-            critical_categories = low_stock_products['category'].value_counts()
+            # Count on plain strings so ties resolve by first appearance, not category order
+            critical_categories = low_stock_products['category'].astype(str).value_counts()
             most_affected_category = critical_categories.index[0] if len(critical_categories) > 0 else 'Unknown'
             
             insights.append({
@@ -301,7 +425,6 @@ class RetailETLPipeline:
             })
         
         # Customer churn insights
-        churn_rate = customer_metrics['is_churned'].mean()
         if churn_rate > 0.3:  # 30% churn rate threshold
             insights.append({
                 'title': 'Customer Retention Concern',
@@ -319,25 +442,30 @@ class RetailETLPipeline:
         
         os.makedirs(output_dir, exist_ok=True)
         
+        # Metrics are kept at full precision until here and rounded once for output;
+        # the customer summary ratios are left as-is since the dashboard formats them
+        export = {
+            key: value if key == 'customer_metrics_summary' else round_floats(value)
+            for key, value in self.processed_data.items()
+        }
+        
         # Export main metrics
-        with open(f'{output_dir}/metrics.json', 'w') as f:
-            json.dump(self.processed_data, f, indent=2, default=str)
+        write_json(f'{output_dir}/metrics.json', export)
         
         # Export individual datasets for API endpoints
         endpoints_data = {
-            'revenue_by_region': self.processed_data['revenue_by_region'],
-            'top_products': self.processed_data['top_products'],
-            'category_performance': self.processed_data['category_performance'],
-            'customer_summary': self.processed_data['customer_metrics_summary'],
-            'age_groups': self.processed_data['age_group_analysis'],
-            'inventory_risks': self.processed_data['inventory_insights'],
-            'monthly_trends': self.processed_data['monthly_trends'],
-            'business_insights': self.processed_data['business_insights']
+            'revenue_by_region': export['revenue_by_region'],
+            'top_products': export['top_products'],
+            'category_performance': export['category_performance'],
+            'customer_summary': export['customer_metrics_summary'],
+            'age_groups': export['age_group_analysis'],
+            'inventory_risks': export['inventory_insights'],
+            'monthly_trends': export['monthly_trends'],
+            'business_insights': export['business_insights']
         }
         
         for endpoint, data in endpoints_data.items():
-            with open(f'{output_dir}/{endpoint}.json', 'w') as f:
-                json.dump(data, f, indent=2, default=str)
+            write_json(f'{output_dir}/{endpoint}.json', data)
         
         print(f"Processed data exported to '{output_dir}' directory")
     
@@ -346,7 +474,8 @@ class RetailETLPipeline:
         print("=== Starting Retail ETL Pipeline ===")
         
         self.load_data()
-        self.clean_data()
+        if not self.loaded_from_cache:
+            self.clean_data()
         self.generate_metrics()
         self.export_data()
         
@@ -6,14 +6,12 @@ Generates fictitious CSV datasets for customers, products, and sales.
 import pandas as pd
 import numpy as np
 from faker import Faker
-import random
-from datetime import datetime, timedelta
 import os
 
-# Initialize Faker
+# Initialize Faker and a single seeded NumPy generator for every random draw
+Faker.seed(42)
 fake = Faker()
-np.random.seed(42)
-random.seed(42)
+rng = np.random.default_rng(42)
 
 # Configuration
 NUM_CUSTOMERS = 1000
@@ -25,139 +23,116 @@ REGIONS = ['North', 'South', 'East', 'West', 'Central']
 CATEGORIES = ['Electronics', 'Fashion', 'Home & Garden', 'Sports', 'Beauty', 'Books', 'Automotive']
 SUPPLIERS = ['TechCorp', 'FashionPlus', 'HomeBase', 'SportZone', 'BeautyWorld', 'BookLand', 'AutoParts']
 
+# Price ranges by category
+PRICE_RANGES = {
+    'Electronics': (50, 2000),
+    'Fashion': (20, 500),
+    'Home & Garden': (15, 800),
+    'Sports': (25, 600),
+    'Beauty': (10, 200),
+    'Books': (8, 50),
+    'Automotive': (30, 1500)
+}
+HIGH_TURNOVER_CATEGORIES = ['Electronics', 'Fashion', 'Beauty']
+
+def random_dates(max_days_back, size):
+    """Random calendar dates between `max_days_back` days ago and today, as YYYY-MM-DD strings"""
+    days_back = rng.integers(0, max_days_back + 1, size)
+    dates = pd.Timestamp.today().normalize() - pd.to_timedelta(days_back, unit='D')
+    return dates.strftime('%Y-%m-%d')
+
 def generate_customers():
     """Generate customers dataset"""
-    customers = []
-    
-    for i in range(1, NUM_CUSTOMERS + 1):
-        customer = {
-            'id': i,
-            'name': fake.name(),
-            'age': np.random.normal(40, 15),  # Normal distribution around 40
-            'region': np.random.choice(REGIONS, p=[0.25, 0.20, 0.20, 0.20, 0.15]),  # Weighted regions
-            'created_at': fake.date_between(start_date='-2y', end_date='today')
-        }
-        # Ensure age is realistic
-        customer['age'] = max(18, min(80, int(customer['age'])))
-        customers.append(customer)
-    
-    return pd.DataFrame(customers)
+    # Normal distribution around 40, truncated to a realistic range
+    ages = np.clip(rng.normal(40, 15, NUM_CUSTOMERS).astype(int), 18, 80)
+    
+    return pd.DataFrame({
+        'id': np.arange(1, NUM_CUSTOMERS + 1),
+        'name': [fake.name() for _ in range(NUM_CUSTOMERS)],
+        'age': ages,
+        'region': rng.choice(REGIONS, size=NUM_CUSTOMERS, p=[0.25, 0.20, 0.20, 0.20, 0.15]),  # Weighted regions
+        'created_at': random_dates(730, NUM_CUSTOMERS)
+    })
 
 def generate_products():
     """Generate products dataset"""
-    products = []
-    
-    for i in range(1, NUM_PRODUCTS + 1):
-        category = np.random.choice(CATEGORIES)
-        
-        # Price ranges by category
-        price_ranges = {
-            'Electronics': (50, 2000),
-            'Fashion': (20, 500),
-            'Home & Garden': (15, 800),
-            'Sports': (25, 600),
-            'Beauty': (10, 200),
-            'Books': (8, 50),
-            'Automotive': (30, 1500)
-        }
-        
-        min_price, max_price = price_ranges[category]
-        
-        product = {
-            'id': i,
-            'name': f"{category} Product {i}",
-            'category': category,
-            'price': round(np.random.uniform(min_price, max_price), 2),
-            'supplier': np.random.choice(SUPPLIERS),
-            'created_at': fake.date_between(start_date='-1y', end_date='today')
-        }
-        products.append(product)
-    
-    return pd.DataFrame(products)
+    ids = np.arange(1, NUM_PRODUCTS + 1)
+    categories = rng.choice(CATEGORIES, size=NUM_PRODUCTS)
+    min_prices = np.array([PRICE_RANGES[c][0] for c in categories])
+    max_prices = np.array([PRICE_RANGES[c][1] for c in categories])
+    
+    return pd.DataFrame({
+        'id': ids,
+        'name': [f"{category} Product {i}" for category, i in zip(categories, ids)],
+        'category': categories,
+        'price': np.round(rng.uniform(min_prices, max_prices), 2),
+        'supplier': rng.choice(SUPPLIERS, size=NUM_PRODUCTS),
+        'created_at': random_dates(365, NUM_PRODUCTS)
+    })
 
 def generate_sales(customers_df, products_df):
     """Generate sales dataset"""
-    sales = []
-    
-    # Create some customer preferences (some customers buy more from certain categories)
-    customer_preferences = {}
-    for customer_id in customers_df['id']:
-        # Some customers have category preferences
-        if random.random() < 0.3:  # 30% have strong preferences
-            preferred_category = np.random.choice(CATEGORIES)
-            customer_preferences[customer_id] = preferred_category
-    
-    for i in range(1, NUM_SALES + 1):
-        customer = customers_df.sample(1).iloc[0]
-        
-        # If customer has preferences, bias product selection
-        if customer['id'] in customer_preferences:
-            preferred_cat = customer_preferences[customer['id']]
-            if random.random() < 0.7:  # 70% chance to buy from preferred category
-                available_products = products_df[products_df['category'] == preferred_cat]
-                if len(available_products) > 0:
-                    product = available_products.sample(1).iloc[0]
-                else:
-                    product = products_df.sample(1).iloc[0]
-            else:
-                product = products_df.sample(1).iloc[0]
-        else:
-            product = products_df.sample(1).iloc[0]
-        
-        # Generate realistic quantity (most sales are 1-3 items)
-        quantity = np.random.choice([1, 2, 3, 4, 5], p=[0.5, 0.25, 0.15, 0.07, 0.03])
-        
-        # Add some price variation (discounts, etc.)
-        unit_price = product['price'] * np.random.uniform(0.8, 1.0)
-        
-        # Generate date with some seasonality
-        base_date = datetime.now() - timedelta(days=365)
-        days_offset = np.random.exponential(100)  # More recent sales
-        days_offset = min(days_offset, 365)
-        sale_date = base_date + timedelta(days=days_offset)
-        
-        sale = {
-            'id': i,
-            'customer_id': customer['id'],
-            'product_id': product['id'],
-            'date': sale_date.strftime('%Y-%m-%d'),
-            'quantity': quantity,
-            'unit_price': round(unit_price, 2),
-            'total_amount': round(unit_price * quantity, 2)
-        }
-        sales.append(sale)
-    
-    return pd.DataFrame(sales)
+    # Create some customer preferences (30% of customers buy more from one category)
+    has_preference = rng.random(len(customers_df)) < 0.3
+    preferred_category = rng.choice(CATEGORIES, size=len(customers_df))
+    
+    # Customers and products are drawn uniformly, then sales of customers with a
+    # preference are redirected to their preferred category 70% of the time
+    customer_idx = rng.integers(0, len(customers_df), NUM_SALES)
+    product_idx = rng.integers(0, len(products_df), NUM_SALES)
+    use_preference = has_preference[customer_idx] & (rng.random(NUM_SALES) < 0.7)
+    
+    product_categories = products_df['category'].values
+    sale_preferences = preferred_category[customer_idx]
+    for category in CATEGORIES:
+        candidates = np.flatnonzero(product_categories == category)
+        biased = use_preference & (sale_preferences == category)
+        if len(candidates) > 0 and biased.any():
+            product_idx[biased] = candidates[rng.integers(0, len(candidates), biased.sum())]
+    
+    # Generate realistic quantity (most sales are 1-3 items)
+    quantities = rng.choice([1, 2, 3, 4, 5], size=NUM_SALES, p=[0.5, 0.25, 0.15, 0.07, 0.03])
+    
+    # Add some price variation (discounts, etc.)
+    unit_prices = products_df['price'].values[product_idx] * rng.uniform(0.8, 1.0, NUM_SALES)
+    
+    # Generate dates with some seasonality (more recent sales)
+    base_date = pd.Timestamp.now() - pd.Timedelta(days=365)
+    days_offset = np.minimum(rng.exponential(100, NUM_SALES), 365)
+    sale_dates = base_date + pd.to_timedelta(days_offset, unit='D')
+    
+    return pd.DataFrame({
+        'id': np.arange(1, NUM_SALES + 1),
+        'customer_id': customers_df['id'].values[customer_idx],
+        'product_id': products_df['id'].values[product_idx],
+        'date': sale_dates.strftime('%Y-%m-%d'),
+        'quantity': quantities,
+        'unit_price': np.round(unit_prices, 2),
+        'total_amount': np.round(unit_prices * quantities, 2)
+    })
 
 def generate_inventory(products_df):
     """Generate inventory dataset"""
-    inventory = []
-    
-    for _, product in products_df.iterrows():
-        # Generate realistic inventory levels
-        max_stock = np.random.randint(10, 500)
-        current_stock = np.random.randint(0, max_stock)
-        reorder_level = int(max_stock * 0.2)  # 20% of max stock
-        
-        # Calculate turnover rate (higher for popular categories)
-        high_turnover_categories = ['Electronics', 'Fashion', 'Beauty']
-        if product['category'] in high_turnover_categories:
-            turnover_rate = np.random.uniform(8, 15)  # Higher turnover
-        else:
-            turnover_rate = np.random.uniform(3, 8)   # Lower turnover
-        
-        inventory_item = {
-            'id': product['id'],
-            'product_id': product['id'],
-            'current_stock': current_stock,
-            'reorder_level': reorder_level,
-            'max_stock': max_stock,
-            'turnover_rate': round(turnover_rate, 2),
-            'last_updated': fake.date_between(start_date='-30d', end_date='today')
-        }
-        inventory.append(inventory_item)
-    
-    return pd.DataFrame(inventory)
+    num_products = len(products_df)
+    
+    # Generate realistic inventory levels
+    max_stock = rng.integers(10, 500, num_products)
+    current_stock = rng.integers(0, max_stock)
+    reorder_level = (max_stock * 0.2).astype(int)  # 20% of max stock
+    
+    # Calculate turnover rate (higher for popular categories)
+    high_turnover = products_df['category'].isin(HIGH_TURNOVER_CATEGORIES).values
+    turnover_rate = rng.uniform(np.where(high_turnover, 8, 3), np.where(high_turnover, 15, 8))
+    
+    return pd.DataFrame({
+        'id': products_df['id'].values,
+        'product_id': products_df['id'].values,
+        'current_stock': current_stock,
+        'reorder_level': reorder_level,
+        'max_stock': max_stock,
+        'turnover_rate': np.round(turnover_rate, 2),
+        'last_updated': random_dates(30, num_products)
+    })
 
 def main():
     """Generate all datasets and save to CSV files"""